@@ -0,0 +1,89 @@
+# benchmarks/bench_deadline.py
+# How far past its deadline_ms a request runs when the origin drip-feeds the body, and
+# when it quickly serves a page that is slow to parse, in normal and progressive mode.
+# Exits non-zero if the overshoot is over MAX_OVERSHOOT_MS, so it doubles as a regression
+# check for fetcher.iter_body and main's parse budget.
+# Run from the project root: python -m benchmarks.bench_deadline
+import contextlib
+import http.server
+import sys
+import threading
+import time
+
+from fastapi import HTTPException
+
+with contextlib.redirect_stdout(sys.stderr): # Model-loading messages
+    from main import classify_website
+
+ORIGIN_PORT = 8792
+DRIP_BYTES = 1024
+DRIP_INTERVAL = 0.3 # Well inside the socket timeout, so only the deadline can stop the read
+DEADLINES_MS = [500, 1000, 2000]
+MAX_OVERSHOOT_MS = 150
+
+HEAVY_PAGE = ("<html><head><title>Heavy page</title></head><body>"
+              + "".join(f"<div class='c{i}'><span></span></div>\n" for i in range(60000))
+              + "</body></html>").encode() # ~2.3 MB of markup, several seconds to parse
+
+class DripHandler(http.server.BaseHTTPRequestHandler):
+    # /drip/...: announces a 2 MB page, then sends DRIP_BYTES every DRIP_INTERVAL seconds.
+    # /heavy/...: sends HEAVY_PAGE at once.
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path.startswith("/heavy/"):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(HEAVY_PAGE)))
+            self.end_headers()
+            try:
+                self.wfile.write(HEAVY_PAGE)
+            except OSError:
+                pass # Client stopped reading at its byte cap
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(2 * 1024 * 1024))
+        self.end_headers()
+        try:
+            self.wfile.write(b"<html><head><title>Slow page</title></head><body>")
+            while True:
+                self.wfile.write(b"<p>" + b"x" * (DRIP_BYTES - 7) + b"</p>\n")
+                self.wfile.flush()
+                time.sleep(DRIP_INTERVAL)
+        except OSError:
+            pass # Client gave up
+
+    def log_message(self, *args):
+        pass
+
+def overshoot_ms(origin: str, deadline_ms: int, progressive: bool) -> float:
+    url = f"http://127.0.0.1:{ORIGIN_PORT}/{origin}/{deadline_ms}/{int(progressive)}/{time.time()}" # Never a cache hit
+    started = time.monotonic()
+    try:
+        classify_website(url, progressive=progressive, deadline_ms=deadline_ms)
+    except HTTPException as e:
+        if e.status_code != 504:
+            raise
+    return (time.monotonic() - started) * 1000 - deadline_ms
+
+if __name__ == "__main__":
+    origin = http.server.ThreadingHTTPServer(("127.0.0.1", ORIGIN_PORT), DripHandler)
+    origin.daemon_threads = True
+    threading.Thread(target=origin.serve_forever, daemon=True).start()
+
+    worst = 0.0
+    print(f"{'origin':>6} {'deadline':>9} {'mode':>12} {'overshoot':>10}")
+    for origin_kind in ("drip", "heavy"):
+        for deadline_ms in DEADLINES_MS:
+            for progressive in (False, True):
+                overshoot = overshoot_ms(origin_kind, deadline_ms, progressive)
+                worst = max(worst, overshoot)
+                print(f"{origin_kind:>6} {deadline_ms:>7}ms {'progressive' if progressive else 'normal':>12} {overshoot:>8.0f}ms")
+    origin.shutdown()
+
+    if worst > MAX_OVERSHOOT_MS:
+        print(f"FAIL: overshoot {worst:.0f}ms is over {MAX_OVERSHOOT_MS}ms")
+        sys.exit(1)
+    print(f"OK: every request ended within {MAX_OVERSHOOT_MS}ms of its deadline")
@@ -0,0 +1,51 @@
+# benchmarks/bench_decode.py
+# Compare requests' `response.text` with fetcher.decode_html on large pages.
+# Run from the project root: python -m benchmarks.bench_decode
+import timeit
+
+from requests.models import Response
+from requests.utils import get_encoding_from_headers
+
+from fetcher import decode_html
+
+PAGE_REPEATS = 20000 # ~1.5 MB of body per page
+RUNS = 5
+
+LATIN_PARAGRAPH = "<p>Café crème, naïve résumé – latest news and prices.</p>\n"
+CYRILLIC_PARAGRAPH = "<p>Последние новости, цены и погода на сегодня.</p>\n"
+
+def build_page(encoding: str, declare_in_meta: bool, paragraph: str = LATIN_PARAGRAPH) -> bytes:
+    meta = f'<meta charset="{encoding}">' if declare_in_meta else ""
+    body = paragraph * PAGE_REPEATS
+    html = f"<html><head>{meta}<title>Benchmark page</title></head><body>{body}</body></html>"
+    return html.encode(encoding, errors="replace")
+
+def requests_text(content: bytes, content_type: str) -> str:
+    # Mirrors what `requests.get(...).text` does once the body is downloaded
+    response = Response()
+    response._content = content
+    response.headers["Content-Type"] = content_type
+    response.encoding = get_encoding_from_headers(response.headers)
+    return response.text
+
+CASES = [
+    # (label, true encoding, page bytes, Content-Type header)
+    ("utf-8, declared in header", "utf-8", build_page("utf-8", False), "text/html; charset=utf-8"),
+    ("utf-8, declared in <meta>", "utf-8", build_page("utf-8", True), "text/html"),
+    ("utf-8, undeclared", "utf-8", build_page("utf-8", False), "application/octet-stream"),
+    ("cp1252, undeclared", "cp1252", build_page("cp1252", False), "text/html"),
+    ("cp1252, no text/* type", "cp1252", build_page("cp1252", False), "application/octet-stream"),
+    ("cp1251, no text/* type", "cp1251", build_page("cp1251", False, CYRILLIC_PARAGRAPH), "application/octet-stream"),
+]
+
+if __name__ == "__main__":
+    # "ok" says whether the decoded text matches the page's real encoding
+    print(f"{'case':<28} {'size':>9} {'response.text':>15} {'ok':>4} {'decode_html':>13} {'ok':>4} {'speedup':>9}")
+    for label, true_encoding, content, content_type in CASES:
+        expected = content.decode(true_encoding)
+        baseline_ok = requests_text(content, content_type) == expected
+        candidate_ok = decode_html(content, content_type) == expected
+        baseline = min(timeit.repeat(lambda: requests_text(content, content_type), number=1, repeat=RUNS))
+        candidate = min(timeit.repeat(lambda: decode_html(content, content_type), number=1, repeat=RUNS))
+        print(f"{label:<28} {len(content) // 1024:>7}KB {baseline * 1000:>13.2f}ms {'yes' if baseline_ok else 'no':>4} "
+              f"{candidate * 1000:>11.2f}ms {'yes' if candidate_ok else 'no':>4} {baseline / candidate:>8.1f}x")
@@ -0,0 +1,65 @@
+# benchmarks/bench_featurize.py
+# Latency and peak memory of featurize.build_text versus the extraction block that
+# main.py and train_model.py used to copy, on large pages, plus the TF-IDF transform
+# that consumes the result (serving used to vectorize the whole page).
+# Run from the project root: python -m benchmarks.bench_featurize
+import re
+import timeit
+import tracemalloc
+import warnings
+
+import joblib
+from bs4 import BeautifulSoup
+
+from featurize import build_text
+
+RUNS = 5
+PAGE_PARAGRAPHS = [2000, 20000, 80000] # ~0.2 MB, ~2 MB and ~8 MB of HTML
+
+def legacy_text(soup) -> str:
+    # The old copy-pasted block, without training's [:10000]
+    text = soup.get_text(separator=" ", strip=True).lower()
+    title = soup.find("title").get_text().lower() if soup.find("title") else ""
+    meta_description = ""
+    for tag in soup.find_all("meta"):
+        if tag.get("name") == "description":
+            meta_description = tag.get("content", "").lower()
+            break
+    combined_text_raw = f"{title} {meta_description} {text}"
+    return re.sub(r'\s+', ' ', combined_text_raw).strip()
+
+def build_page(paragraphs: int) -> str:
+    body = "".join(f"<p>Latest   News\n headline {i}: markets, politics and the economy.</p>\n" for i in range(paragraphs))
+    return (f"<html><head><title>Big Page</title><meta name=\"description\" content=\"A very large page\"></head>"
+            f"<body>{body}</body></html>")
+
+def peak_kb(func) -> float:
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024
+
+if __name__ == "__main__":
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore") # scikit-learn version mismatch warnings on unpickling
+        vectorizer = joblib.load("tfidf_vectorizer.pkl")
+
+    print(f"{'page':>8} | {'legacy text':>12} {'peak':>9} {'transform':>10} | {'build_text':>11} {'peak':>9} {'transform':>10}")
+    for paragraphs in PAGE_PARAGRAPHS:
+        html = build_page(paragraphs)
+        soup = BeautifulSoup(html, "html.parser") # Parsing is the same either way; not timed
+
+        legacy = legacy_text(soup)
+        bounded = build_text(soup)
+        assert legacy[:len(bounded)] == bounded
+
+        legacy_ms = min(timeit.repeat(lambda: legacy_text(soup), number=1, repeat=RUNS)) * 1000
+        bounded_ms = min(timeit.repeat(lambda: build_text(soup), number=1, repeat=RUNS)) * 1000
+        legacy_peak = peak_kb(lambda: legacy_text(soup))
+        bounded_peak = peak_kb(lambda: build_text(soup))
+        legacy_transform_ms = min(timeit.repeat(lambda: vectorizer.transform([legacy]), number=1, repeat=RUNS)) * 1000
+        bounded_transform_ms = min(timeit.repeat(lambda: vectorizer.transform([bounded]), number=1, repeat=RUNS)) * 1000
+
+        print(f"{len(html) // 1024:>6}KB | {legacy_ms:>10.1f}ms {legacy_peak:>7.0f}KB {legacy_transform_ms:>8.1f}ms | "
+              f"{bounded_ms:>9.1f}ms {bounded_peak:>7.0f}KB {bounded_transform_ms:>8.1f}ms")
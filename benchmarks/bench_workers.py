@@ -0,0 +1,103 @@
+# benchmarks/bench_workers.py
+# Memory per worker and result-cache hit rate versus worker count for the pre-fork
+# deployment (gunicorn.conf.py). Linux only: memory is read from /proc.
+# Run from the project root: python -m benchmarks.bench_workers
+import http.server
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+WORKER_COUNTS = [1, 2, 4]
+DISTINCT_URLS = 40
+REPEATS_PER_URL = 5
+CLIENT_THREADS = 8
+ORIGIN_PORT = 8790
+API_PORT = 8791
+
+class OriginHandler(http.server.BaseHTTPRequestHandler):
+    # Serves a small generated page per path and counts how often it is actually fetched
+    protocol_version = "HTTP/1.1"
+    fetches = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with OriginHandler.lock:
+            OriginHandler.fetches += 1
+        body = f"<html><head><title>Page {self.path}</title></head><body>{'<p>latest news headline</p>' * 200}</body></html>".encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def worker_pids(master_pid: int) -> list:
+    with open(f"/proc/{master_pid}/task/{master_pid}/children") as f:
+        return [int(pid) for pid in f.read().split()]
+
+def memory_kb(pid: int) -> tuple:
+    # (RSS, PSS): PSS splits shared pages between the processes sharing them
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Pss"):
+                values[key] = int(rest.split()[0])
+    return values["Rss"], values["Pss"]
+
+def run(workers: int, preload: bool) -> dict:
+    cache_path = os.path.join(tempfile.mkdtemp(), "result_cache.sqlite3")
+    env = dict(os.environ, WEB_CONCURRENCY=str(workers), BIND=f"127.0.0.1:{API_PORT}",
+               PRELOAD_APP="1" if preload else "0", RESULT_CACHE_PATH=cache_path)
+    server = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "main:app"],
+                              env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        # Wait until every worker has booted and answers
+        for _ in range(600):
+            try:
+                requests.get(f"http://127.0.0.1:{API_PORT}/stats", timeout=1)
+                if len(worker_pids(server.pid)) == workers:
+                    break
+            except (requests.exceptions.RequestException, FileNotFoundError):
+                pass
+            time.sleep(0.1)
+        time.sleep(1)
+
+        urls = [f"http://127.0.0.1:{ORIGIN_PORT}/page/{i}" for i in range(DISTINCT_URLS)] * REPEATS_PER_URL
+        random.Random(0).shuffle(urls)
+        fetches_before = OriginHandler.fetches
+        with ThreadPoolExecutor(CLIENT_THREADS) as pool:
+            list(pool.map(lambda url: requests.post(f"http://127.0.0.1:{API_PORT}/classify", json={"url": url}, timeout=60), urls))
+        origin_fetches = OriginHandler.fetches - fetches_before
+
+        memory = [memory_kb(pid) for pid in worker_pids(server.pid)]
+        return {
+            "rss_mb": sum(rss for rss, _ in memory) / len(memory) / 1024,
+            "pss_mb": sum(pss for _, pss in memory) / len(memory) / 1024,
+            "hit_rate": 1 - origin_fetches / len(urls),
+        }
+    finally:
+        server.terminate()
+        server.wait()
+
+if __name__ == "__main__":
+    origin = http.server.ThreadingHTTPServer(("127.0.0.1", ORIGIN_PORT), OriginHandler)
+    threading.Thread(target=origin.serve_forever, daemon=True).start()
+
+    best_hit_rate = 1 - 1 / REPEATS_PER_URL
+    print(f"{DISTINCT_URLS} URLs x {REPEATS_PER_URL} requests each (best possible hit rate {best_hit_rate:.0%})")
+    print(f"{'workers':>7} {'preload':>8} {'RSS/worker':>11} {'PSS/worker':>11} {'hit rate':>9}")
+    for workers in WORKER_COUNTS:
+        for preload in (True, False):
+            result = run(workers, preload)
+            print(f"{workers:>7} {'yes' if preload else 'no':>8} {result['rss_mb']:>9.1f}MB {result['pss_mb']:>9.1f}MB {result['hit_rate']:>9.0%}")
+    origin.shutdown()
@@ -0,0 +1,231 @@
+# classifier.py
+# Extraction, heuristic and ML stages, independent of how the HTML was obtained
+# (live fetch in main.py, archived pages in classify_offline.py).
+from bs4 import BeautifulSoup
+import tldextract
+from typing import Optional
+import re
+import joblib # For loading ML models
+import numpy as np # For numerical operations with ML probabilities
+from featurize import MAX_FEATURE_CHARS, build_text
+
+# Comprehensive website types with refined keywords
+WEBSITE_TYPES = {
+    "e-commerce": ["shop", "cart", "buy", "store", "product", "price", "checkout", "add to cart", "payment", "deal", "coupon", "discount"],
+    "blog": ["blog", "post", "article", "read more", "comment", "author", "category", "tag", "subscribe", "newsletter"],
+    "news": ["news", "breaking", "headline", "report", "latest", "update", "journal", "editorial", "politics", "economy", "world"],
+    "portfolio": ["portfolio", "project", "work", "gallery", "showcase", "creative", "design", "artist", "resume"],
+    "forum": ["forum", "thread", "post", "discussion", "reply", "community", "board", "group", "topic", "members"],
+    "corporate": ["company", "about us", "services", "contact us", "careers", "business", "enterprise", "solution", "investor"],
+    "personal": ["about me", "personal", "bio", "resume", "cv", "profile", "hobby", "my story"],
+    "educational": ["course", "learn", "university", "school", "education", "study", "academy", "lecture", "student", "syllabus"],
+    "government": ["gov", "government", "official", "public", "department", "agency", "state", "policy", "citizen", "council"],
+    "non-profit": ["donate", "charity", "non-profit", "volunteer", "mission", "cause", "foundation", "support", "fundraiser"],
+    "social media": ["follow", "share", "like", "post", "profile", "connect", "network", "friend", "feed", "community"],
+    "entertainment": ["video", "movie", "music", "stream", "watch", "play", "entertainment", "show", "artist", "album"],
+    "wiki": ["wiki", "encyclopedia", "knowledge", "edit", "reference", "information", "article", "fandom"],
+    "job board": ["job", "career", "hiring", "vacancy", "apply", "recruitment", "employment", "resume", "positions", "openings"],
+    "directory": ["directory", "listing", "search", "find", "businesses", "categories", "reviews", "local", "contact"],
+    "health": ["health", "medical", "doctor", "hospital", "wellness", "clinic", "patient", "therapy", "disease", "symptom"],
+    "travel": ["travel", "tour", "booking", "destination", "hotel", "flight", "vacation", "itinerary", "explore", "journey"],
+    "real estate": ["property", "real estate", "listing", "home", "rent", "buy", "mortgage", "broker", "house", "apartment"],
+    "video streaming": ["stream", "video", "watch", "channel", "subscribe", "live", "episode", "series", "tv"],
+    "gaming": ["game", "gaming", "play", "score", "leaderboard", "multiplayer", "console", "esports", "gamer", "level"],
+    "event": ["event", "ticket", "festival", "conference", "seminar", "webinar", "schedule", "register", "date"],
+    "food": ["recipe", "food", "cooking", "restaurant", "menu", "cuisine", "dine", "chef", "ingredient"],
+    "sports": ["sport", "team", "score", "league", "match", "athlete", "tournament", "game", "championship"],
+}
+
+ML_CONFIDENCE_THRESHOLD = 0.80 # Threshold for prioritizing ML prediction
+MAX_TOP_K = 20 # Upper bound on the classes and terms returned by top_k
+
+# --- Load the pre-trained ML model and vectorizer ---
+vectorizer = None
+model = None
+trained_classes = []
+class_index = {} # Class name -> position in trained_classes
+feature_names = [] # Vocabulary term per TF-IDF column, for attributing predictions
+
+try:
+    # mmap_mode keeps the numpy arrays file-backed, so every worker process shares their pages
+    vectorizer = joblib.load('tfidf_vectorizer.pkl', mmap_mode='r')
+    model = joblib.load('website_classifier_model.pkl', mmap_mode='r')
+    trained_classes = model.classes_ # Get the classes the model was trained on
+    class_index = {str(name): i for i, name in enumerate(trained_classes)}
+    feature_names = vectorizer.get_feature_names_out() # Built once here instead of per request
+    print("--- Machine learning model loaded successfully. ---")
+except FileNotFoundError:
+    print("\n--- WARNING: ML model files (tfidf_vectorizer.pkl, website_classifier_model.pkl) not found. ---")
+    print("--- Please run 'python train_model.py' first to train and save the model. ---")
+    print("--- Classification will fall back to heuristic classification only, which may be less accurate. ---\n")
+except Exception as e:
+    print(f"\n--- ERROR loading ML model: {e}. Falling back to heuristic classification only. ---\n")
+
+def _class_coefficients(class_idx: int):
+    # Coefficient row behind trained_classes[class_idx]; a binary model stores one row for the positive class
+    if model.coef_.shape[0] == 1:
+        return model.coef_[0] if class_idx == 1 else -model.coef_[0]
+    return model.coef_[class_idx]
+
+def _top_k_explanation(text_features, probabilities, top_k: int, explained_type: str) -> dict:
+    """
+    The `top_k` most probable classes, and the `top_k` terms pushing hardest towards
+    `explained_type` (the returned type, which heuristics may have picked over the ML argmax).
+    A term's contribution is its TF-IDF weight times the class coefficient, read off the
+    nonzeros of the row already built for predict_proba, so nothing is inferred twice.
+    "explained_type" is None, with no terms, when the model has no such class.
+    """
+    top_k = min(top_k, MAX_TOP_K)
+    class_order = np.argsort(-probabilities, kind="stable")[:top_k] # Ties resolve like np.argmax
+    top_classes = [{"type": str(trained_classes[i]), "probability": round(float(probabilities[i]), 4)} for i in class_order]
+
+    if explained_type not in class_index:
+        return {"top_classes": top_classes, "explained_type": None, "top_terms": []}
+    row = text_features.tocsr()
+    contributions = row.data * _class_coefficients(class_index[explained_type])[row.indices]
+    term_order = np.argsort(-contributions, kind="stable")[:top_k]
+    top_terms = [{"term": str(feature_names[row.indices[i]]), "weight": round(float(contributions[i]), 4)}
+                 for i in term_order if contributions[i] > 0]
+    return {"top_classes": top_classes, "explained_type": explained_type, "top_terms": top_terms}
+
+def classify_html(url: str, html: str, suffix: Optional[str] = None, top_k: int = 0) -> tuple:
+    """
+    Run extraction, heuristics and the ML model over an HTML document.
+    Returns the result dict and the raw ML confidence (0.0 if ML was unavailable).
+    `suffix` is the URL's public suffix; it is looked up from `url` when not given.
+    With `top_k` > 0 the result also carries "top_classes" and "top_terms" from the ML pass,
+    the terms explaining the returned type ("explained_type"; None and no terms if ML
+    was unavailable or doesn't know that type).
+    """
+    result, ml_confidence_raw, _ = classify_html_pass(url, html, suffix, top_k)
+    return result, ml_confidence_raw
+
+def classify_html_pass(url: str, html: str, suffix: Optional[str] = None, top_k: int = 0) -> tuple:
+    """
+    classify_html, plus whether the model's text filled MAX_FEATURE_CHARS. Once it has,
+    more of the same page can't change what the model sees (progressive mode stops there).
+    """
+    if suffix is None:
+        suffix = tldextract.extract(url).suffix
+
+    # Parse HTML content
+    soup = BeautifulSoup(html, "html.parser")
+    
+    # Title, meta description and page text, normalized and bounded exactly as in training
+    combined_text = build_text(soup)
+    text_is_full = len(combined_text) >= MAX_FEATURE_CHARS
+
+    # Initialize heuristic scores
+    heuristic_scores = {type_name: 0 for type_name in WEBSITE_TYPES}
+
+    # Domain-based heuristics
+    if suffix in ["edu", "ac"]:
+        heuristic_scores["educational"] += 3
+    if suffix == "gov":
+        heuristic_scores["government"] += 3
+    if suffix == "org" and "donate" in combined_text:
+        heuristic_scores["non-profit"] += 2
+
+    # Keyword-based scoring (using a portion of text for efficiency)
+    text_for_heuristics = combined_text[:5000] # Use first 5000 chars for heuristic speed
+    for type_name, keywords in WEBSITE_TYPES.items():
+        for keyword in keywords:
+            if keyword in text_for_heuristics:
+                heuristic_scores[type_name] += 1
+
+    # Structural checks using regex for class names
+    if soup.find_all(["form", "input", "select"]) and any(k in text_for_heuristics for k in ["cart", "checkout"]):
+        heuristic_scores["e-commerce"] += 3
+    if soup.find_all(["article", "section"]) and "blog" in text_for_heuristics:
+        heuristic_scores["blog"] += 3
+    if soup.find_all(["div"], class_=re.compile(r"gallery|portfolio")):
+        heuristic_scores["portfolio"] += 3
+    if soup.find_all(["form"], class_=re.compile(r"search")) and "directory" in text_for_heuristics:
+        heuristic_scores["directory"] += 3
+    if soup.find_all(["div"], class_=re.compile(r"job|career|hiring|vacanc")):
+        heuristic_scores["job board"] += 3
+    if soup.find_all(["a"], href=re.compile(r"wiki|edit")):
+        heuristic_scores["wiki"] += 3
+    if soup.find_all(["button", "a"], string=re.compile(r"donate", re.I)):
+        heuristic_scores["non-profit"] += 3
+    if soup.find_all(["video", "iframe"]) and any(k in text_for_heuristics for k in ["stream", "watch"]):
+        heuristic_scores["video streaming"] += 3
+    if soup.find_all(["div"], class_=re.compile(r"game|score|gaming")):
+        heuristic_scores["gaming"] += 3
+    if soup.find_all(["a", "button"], string=re.compile(r"ticket|event|conference|festival", re.I)):
+        heuristic_scores["event"] += 3
+
+    # --- ML-based Prediction ---
+    ml_type_prediction = "unknown"
+    ml_confidence_raw = 0.0
+    ml_pass = None # (features, probabilities), kept for top_k
+
+    if model and vectorizer:
+        try:
+            # Transform the combined_text (same MAX_FEATURE_CHARS bound as training) for ML prediction
+            text_features = vectorizer.transform([combined_text])
+            
+            # Get probability predictions for all classes
+            probabilities = model.predict_proba(text_features)[0]
+            
+            # Find the class with the highest probability
+            max_prob_idx = np.argmax(probabilities)
+            ml_type_prediction = trained_classes[max_prob_idx]
+            ml_confidence_raw = probabilities[max_prob_idx]
+            ml_pass = (text_features, probabilities)
+                
+        except Exception as e:
+            print(f"DEBUG: Error during ML prediction for {url}: {e}")
+            # ML prediction failed, will proceed with heuristics
+    
+    # --- Final Determination ---
+    final_type = "unknown"
+    final_confidence = 0.0
+
+    # Prioritize ML prediction if it's confident enough
+    if ml_confidence_raw >= ML_CONFIDENCE_THRESHOLD:
+        final_type = ml_type_prediction
+        final_confidence = float(ml_confidence_raw)
+    else:
+        # Fallback to heuristic scores if ML is not confident or not available
+        max_heuristic_score = max(heuristic_scores.values())
+
+        if max_heuristic_score > 0:
+            best_heuristic_type = max(heuristic_scores, key=heuristic_scores.get)
+            total_heuristic_score = sum(heuristic_scores.values())
+            
+            # Normalize heuristic score to give an approximate confidence (0-1)
+            # This is a simple normalization; a more complex one might use domain knowledge
+            # For example, a perfect heuristic score might get 0.7 confidence by default
+            heuristic_confidence_normalized = (max_heuristic_score / total_heuristic_score) if total_heuristic_score > 0 else 0.0
+            
+            # If ML was attempted but not confident, average with heuristic or take the best
+            if model and ml_confidence_raw > 0: # If ML provided some (low confidence) probability
+                final_confidence = np.mean([heuristic_confidence_normalized, ml_confidence_raw])
+                # If ML has a specific type, but heuristic is also strong, prefer ML if it's not too far off
+                if ml_type_prediction != "unknown" and ml_confidence_raw > heuristic_confidence_normalized:
+                    final_type = ml_type_prediction
+                else:
+                    final_type = best_heuristic_type
+            else: # Only heuristic is available
+                final_type = best_heuristic_type
+                final_confidence = heuristic_confidence_normalized
+        
+        # If still no strong signal, default to unknown
+        if final_type == "unknown" and final_confidence == 0.0 and ml_confidence_raw < ML_CONFIDENCE_THRESHOLD:
+             # If even after averaging, confidence is low, and ML wasn't confident.
+             # Consider the highest heuristic as a "best guess" but with low confidence.
+             if max_heuristic_score > 0:
+                final_type = max(heuristic_scores, key=heuristic_scores.get)
+                final_confidence = max_heuristic_score / (sum(WEBSITE_TYPES[final_type]) * 2) if sum(WEBSITE_TYPES[final_type]) > 0 else 0.0 # Example simple scaling
+                final_confidence = min(0.49, final_confidence) # Ensure it's explicitly below 0.5 if not confident
+             # Otherwise it stays "unknown" with 0.0 confidence
+
+    # Attribute the type actually returned, reusing the ML pass above
+    explanation = {}
+    if top_k > 0:
+        explanation = {"top_classes": [], "explained_type": None, "top_terms": []}
+        if ml_pass is not None:
+            explanation = _top_k_explanation(*ml_pass, top_k, final_type)
+
+    return {"url": url, "type": final_type, "confidence": round(float(final_confidence), 2), **explanation}, ml_confidence_raw, text_is_full
@@ -0,0 +1,117 @@
+# classify_offline.py
+# Classify already-archived pages without fetching anything:
+#   python classify_offline.py crawl_dir/ more.warc.gz --workers 8 --output results.ndjson
+# HTML files (.html/.htm) and WARC files (.warc/.warc.gz, needs `pip install warcio`) are
+# accepted directly or found by walking directories. Results stream out as NDJSON, one line per page.
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+from fetcher import MAX_CONTENT_BYTES, decode_html
+
+with contextlib.redirect_stdout(sys.stderr): # Keep model-loading messages out of the NDJSON output
+    from classifier import classify_html
+
+try:
+    from warcio.archiveiterator import ArchiveIterator
+except ImportError:
+    ArchiveIterator = None
+
+HTML_EXTENSIONS = (".html", ".htm")
+WARC_EXTENSIONS = (".warc", ".warc.gz")
+TASKS_IN_FLIGHT_PER_WORKER = 4 # Bounds memory: archives are read only as fast as workers keep up
+
+def iter_archive_files(paths):
+    for path in paths:
+        path = Path(path)
+        if path.is_dir():
+            for root, _, files in os.walk(path):
+                for name in sorted(files):
+                    yield Path(root) / name
+        else:
+            yield path
+
+def iter_tasks(paths):
+    """
+    Yield (url, source, file path, payload, content type) per page. HTML files are passed
+    by path so workers read them; WARC records are read here and passed by content.
+    """
+    for path in iter_archive_files(paths):
+        name = path.name.lower()
+        if name.endswith(HTML_EXTENSIONS):
+            yield path.resolve().as_uri(), str(path), str(path), None, None
+        elif name.endswith(WARC_EXTENSIONS):
+            if ArchiveIterator is None:
+                print(f"Skipping {path}: reading WARC files needs 'pip install warcio'.", file=sys.stderr)
+                continue
+            with open(path, "rb") as stream:
+                for record in ArchiveIterator(stream):
+                    if record.rec_type != "response" or record.http_headers is None:
+                        continue
+                    content_type = record.http_headers.get_header("Content-Type") or ""
+                    if "html" not in content_type.lower():
+                        continue
+                    url = record.rec_headers.get_header("WARC-Target-URI")
+                    # content_stream() undoes chunked and gzip transfer encodings
+                    yield url, str(path), None, record.content_stream().read(MAX_CONTENT_BYTES), content_type
+
+def classify_task(task, top_k: int = 0) -> dict:
+    url, source, file_path, payload, content_type = task
+    try:
+        if file_path is not None:
+            with open(file_path, "rb") as f:
+                payload = f.read(MAX_CONTENT_BYTES)
+            # Local files have no domain to draw suffix heuristics from
+            result, _ = classify_html(url, decode_html(payload, content_type), suffix="", top_k=top_k)
+        else:
+            result, _ = classify_html(url, decode_html(payload, content_type), top_k=top_k)
+        return {**result, "source": source}
+    except Exception as e:
+        return {"url": url, "source": source, "error": str(e)}
+
+def classify_archives(paths, workers: int, top_k: int = 0):
+    """
+    Classify every page under `paths` across `workers` processes, yielding results
+    as they finish (not in input order).
+    """
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        tasks = iter_tasks(paths)
+        pending = set()
+        while True:
+            for task in tasks:
+                pending.add(pool.submit(classify_task, task, top_k))
+                if len(pending) >= workers * TASKS_IN_FLIGHT_PER_WORKER:
+                    break
+            if not pending:
+                return
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Classify archived HTML files and WARC archives without re-fetching them.")
+    parser.add_argument("paths", nargs="+", help="HTML files, WARC files, or directories containing them")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes (default: one per CPU)")
+    parser.add_argument("--output", help="write NDJSON here instead of stdout")
+    parser.add_argument("--top-k", type=int, default=0, help="also output the k most probable classes and the terms behind the top one")
+    args = parser.parse_args()
+
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    started = time.monotonic()
+    pages = errors = 0
+    try:
+        for result in classify_archives(args.paths, args.workers, args.top_k):
+            output.write(json.dumps(result) + "\n")
+            pages += 1
+            errors += "error" in result
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    elapsed = time.monotonic() - started
+    print(f"Classified {pages} pages ({errors} errors) in {elapsed:.1f}s, {pages / elapsed if elapsed else 0:.1f} pages/s.", file=sys.stderr)
@@ -0,0 +1,39 @@
+# featurize.py
+# The text the ML model sees, built the same way for training (train_model.py)
+# and for classification (classifier.py). Both fetch pages with fetcher.fetch_html,
+# so the byte cap and charset decoding in front of this match as well.
+import re
+
+MAX_FEATURE_CHARS = 10000 # Training has always truncated to this; serving now matches it
+
+WORD_PATTERN = re.compile(r"\S+")
+
+def build_text(soup, max_chars: int = MAX_FEATURE_CHARS) -> str:
+    """
+    Lowercased "title meta-description page-text" with whitespace collapsed, cut to `max_chars`.
+    Equivalent to joining the three, collapsing whitespace and slicing, but the page's
+    strings are consumed word by word only until `max_chars` is reached, so a large
+    page is never copied in full.
+    """
+    title_tag = soup.find("title")
+    title = title_tag.get_text() if title_tag else ""
+    # find() stops at the first match instead of collecting every <meta> on the page
+    meta_tag = soup.find("meta", attrs={"name": "description"})
+    meta_description = meta_tag.get("content", "") if meta_tag else ""
+
+    words = []
+    size = -1 # No separator before the first word
+    for string in _iter_strings(title, meta_description, soup):
+        for match in WORD_PATTERN.finditer(string):
+            words.append(match.group())
+            size += len(words[-1]) + 1
+            if size >= max_chars:
+                return " ".join(words).lower()[:max_chars]
+    return " ".join(words).lower()[:max_chars]
+
+def _iter_strings(title: str, meta_description: str, soup):
+    yield title
+    yield meta_description
+    # Same strings as soup.get_text() (script and style contents are skipped);
+    # unstripped, since the word split already drops the surrounding whitespace
+    yield from soup.strings
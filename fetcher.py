@@ -0,0 +1,543 @@
+# fetcher.py
+import codecs
+import ipaddress
+import os
+import re
+import socket
+import threading
+import time
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from contextlib import contextmanager
+from typing import Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.compat import chardet # charset_normalizer or chardet, whichever requests was installed with
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, DecodeError, NewConnectionError, ProtocolError, ReadTimeoutError, SSLError
+
+# --- Fetch settings ---
+FETCH_HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"}
+STREAM_CHUNK_SIZE = 8 * 1024
+MAX_CONTENT_BYTES = 2 * 1024 * 1024 # Never download or decode more than this per page
+REQUEST_TIMEOUT = 15 # Seconds, used when the caller gives no deadline
+
+# --- Failure handling settings ---
+NEGATIVE_CACHE_TTL = 60 # Seconds a failed URL is answered from cache instead of re-fetched
+NEGATIVE_CACHE_MAX_ENTRIES = 10000
+CIRCUIT_FAILURE_THRESHOLD = 3 # Consecutive failures before a host's circuit opens
+CIRCUIT_OPEN_SECONDS = 30 # How long an open circuit fails fast before a trial request
+
+# --- Connection reuse settings ---
+DNS_CACHE_TTL = 300 # Seconds a resolved address is reused (getaddrinfo doesn't expose record TTLs)
+DNS_RESOLVER_THREADS = 8
+POOL_HOSTS = 100 # Hosts that keep a pool of keep-alive connections
+POOL_CONNECTIONS_PER_HOST = 16
+
+# --- Charset detection settings ---
+CHARSET_SNIFF_BYTES = 4 * 1024 # Where we look for a BOM or <meta charset>
+CHARSET_DETECT_SAMPLE_BYTES = 32 * 1024 # Upper bound for statistical detection
+CHARSET_DETECT_MIN_CONFIDENCE = 0.9
+CHARSET_DETECT_MIN_NON_ASCII = 64 # Fewer high bytes than this is too little evidence to trust a guess
+DEFAULT_ENCODING = "utf-8"
+FALLBACK_ENCODING = "cp1252" # Undeclared and not UTF-8: the WHATWG default, and what requests gave text/html
+
+HEADER_CHARSET_PATTERN = re.compile(r"charset\s*=\s*[\"']?\s*([\w.:-]+)", re.I)
+META_CHARSET_PATTERN = re.compile(rb"<meta[^>]+?charset\s*=\s*[\"']?\s*([\w.:-]+)", re.I)
+
+# Checked longest first so a UTF-32 LE BOM isn't mistaken for UTF-16 LE
+BOMS = [
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+
+def _normalize_encoding(name) -> Optional[str]:
+    # Map a declared label to a Python codec name, or None if it's unknown
+    if not name:
+        return None
+    if isinstance(name, bytes):
+        name = name.decode("ascii", errors="ignore")
+    try:
+        codec_name = codecs.lookup(name.strip()).name
+    except LookupError:
+        return None
+    # Browsers treat latin-1/ascii labels as windows-1252, which is a superset
+    if codec_name in ("latin-1", "iso8859-1", "ascii"):
+        return "cp1252"
+    return codec_name
+
+def _looks_like_utf8(sample: bytes, is_complete: bool) -> bool:
+    # A strict incremental decode tolerates a multi-byte sequence cut off at the end of the sample
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=is_complete)
+        return True
+    except UnicodeDecodeError:
+        return False
+
+def _is_confident_guess(sample: bytes, encoding: str, confidence: float) -> bool:
+    if confidence < CHARSET_DETECT_MIN_CONFIDENCE:
+        return False
+    if sum(byte > 0x7F for byte in sample) < CHARSET_DETECT_MIN_NON_ASCII:
+        return False
+    # Detectors can't tell Latin code pages apart (German cp1252 comes back as mac_turkish),
+    # so only trust a guess that reads as another script, where cp1252 would be garbage
+    letters = [char for char in sample.decode(encoding, errors="ignore") if ord(char) > 0x7F and char.isalpha()]
+    latin = sum(unicodedata.name(char, "").startswith("LATIN") for char in letters)
+    return latin * 2 < len(letters)
+
+def detect_encoding(content: bytes, content_type: Optional[str] = None, is_complete: Optional[bool] = None) -> str:
+    """
+    Pick the encoding for an HTML payload: BOM, then HTTP header, then <meta charset>
+    in the first few KB, then a strict UTF-8 check. Anything else is cp1252, unless the
+    Content-Type isn't text/* and statistical detection on a bounded sample is confident.
+    `is_complete` says whether `content` is the whole body; when not given, content no
+    longer than the detection sample is taken to be whole.
+    """
+    head = content[:CHARSET_SNIFF_BYTES]
+
+    for bom, encoding in BOMS:
+        if head.startswith(bom):
+            return encoding
+
+    if content_type:
+        match = HEADER_CHARSET_PATTERN.search(content_type)
+        encoding = _normalize_encoding(match.group(1)) if match else None
+        if encoding:
+            return encoding
+
+    match = META_CHARSET_PATTERN.search(head)
+    encoding = _normalize_encoding(match.group(1)) if match else None
+    if encoding:
+        # A byte-oriented page can't really be UTF-16 if we just read its meta tag as ASCII
+        return DEFAULT_ENCODING if encoding.startswith("utf-16") else encoding
+
+    sample = content[:CHARSET_DETECT_SAMPLE_BYTES]
+    if is_complete is None:
+        is_complete = len(content) <= CHARSET_DETECT_SAMPLE_BYTES
+    # A prefix (a progressive window, a capped read) may end mid-character
+    if _looks_like_utf8(sample, is_complete=is_complete and len(content) <= CHARSET_DETECT_SAMPLE_BYTES):
+        return DEFAULT_ENCODING
+
+    # Servers label text/html as such even when they don't name a charset; keep the HTML default there
+    if chardet is None or (content_type or "").strip().lower().startswith("text/"):
+        return FALLBACK_ENCODING
+    detected = chardet.detect(sample)
+    encoding = _normalize_encoding(detected.get("encoding"))
+    if encoding and _is_confident_guess(sample, encoding, detected.get("confidence") or 0.0):
+        return encoding
+    return FALLBACK_ENCODING
+
+def decode_html(content: bytes, content_type: Optional[str] = None, encoding: Optional[str] = None,
+                is_complete: Optional[bool] = None) -> str:
+    """
+    Decode the byte-capped prefix of a page. Pass `encoding` to reuse an earlier detection.
+    """
+    content = content[:MAX_CONTENT_BYTES]
+    encoding = encoding or detect_encoding(content, content_type, is_complete)
+    # A multi-byte sequence cut at the cap is replaced rather than raising
+    return content.decode(encoding, errors="replace")
+
+class CachedFailure(requests.exceptions.RequestException):
+    """The URL failed recently and is still in the negative cache."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Too many recent failures for this host; failing fast instead of fetching."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """The caller's total latency budget ran out."""
+
+class Deadline:
+    """
+    Total time budget for one classification, shared by DNS, connect, read and parse.
+    """
+
+    def __init__(self, seconds: float):
+        self.expires_at = time.monotonic() + seconds
+
+    @classmethod
+    def from_ms(cls, milliseconds: Optional[int]):
+        return cls(milliseconds / 1000) if milliseconds is not None else None
+
+    def remaining(self) -> float:
+        return self.expires_at - time.monotonic()
+
+    def check(self, stage: str):
+        if self.remaining() <= 0:
+            raise DeadlineExceeded(f"Deadline exceeded during {stage}")
+
+class NegativeCache:
+    """
+    Short-TTL memory of failed URLs so client retries don't pay the full timeout again.
+    """
+
+    def __init__(self, ttl: float = NEGATIVE_CACHE_TTL, max_entries: int = NEGATIVE_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {} # url -> (expires_at, error message)
+        self._lock = threading.Lock()
+
+    def check(self, url: str):
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None:
+                return
+            expires_at, message = entry
+            retry_after = expires_at - time.monotonic()
+            if retry_after <= 0:
+                del self._entries[url]
+                return
+        raise CachedFailure(message, retry_after)
+
+    def add(self, url: str, error: Exception):
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                # Dicts keep insertion order, so this drops the oldest entry
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[url] = (time.monotonic() + self.ttl, str(error))
+
+class CircuitBreaker:
+    """
+    Per-host breaker: after CIRCUIT_FAILURE_THRESHOLD consecutive failures the host
+    fails fast for CIRCUIT_OPEN_SECONDS, then a single trial request is let through.
+    """
+
+    def __init__(self, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD, open_seconds: float = CIRCUIT_OPEN_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self._hosts = {} # host -> [consecutive failures, open until]
+        self._lock = threading.Lock()
+
+    def check(self, host: str):
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None or state[0] < self.failure_threshold:
+                return
+            retry_after = state[1] - time.monotonic()
+            if retry_after <= 0:
+                # Half-open: let this request through, but keep others failing fast until it reports back
+                state[1] = time.monotonic() + self.open_seconds
+                return
+        raise CircuitOpenError(f"Circuit open for {host} after {state[0]} consecutive failures", retry_after)
+
+    def record_success(self, host: str):
+        with self._lock:
+            self._hosts.pop(host, None)
+
+    def record_failure(self, host: str):
+        with self._lock:
+            state = self._hosts.setdefault(host, [0, 0.0])
+            state[0] += 1
+            if state[0] >= self.failure_threshold:
+                state[1] = time.monotonic() + self.open_seconds
+
+negative_cache = NegativeCache()
+circuit_breaker = CircuitBreaker()
+
+class DNSCache:
+    """
+    Process-wide resolver cache. Lookups run on a small thread pool so they can be
+    bounded by the connect timeout, which never exceeds the caller's deadline.
+    """
+
+    def __init__(self, ttl: float = DNS_CACHE_TTL):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = {} # (host, port) -> (expires_at, [ip, ...])
+        self._lock = threading.Lock()
+        self._executor = None
+        self._executor_pid = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Threads don't survive a fork, so each worker process gets its own pool
+        if self._executor is None or self._executor_pid != os.getpid():
+            self._executor = ThreadPoolExecutor(max_workers=DNS_RESOLVER_THREADS, thread_name_prefix="dns")
+            self._executor_pid = os.getpid()
+        return self._executor
+
+    def resolve(self, host: str, port: int, timeout: Optional[float] = None) -> list:
+        """
+        Every address getaddrinfo returned, in its order (apart from demotions), so a caller
+        can fall back across them the way socket.create_connection does.
+        """
+        try:
+            ipaddress.ip_address(host)
+            return [host] # Already an address literal
+        except ValueError:
+            pass
+
+        key = (host, port)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() < entry[0]:
+                self.hits += 1
+                return list(entry[1])
+            self.misses += 1
+            executor = self._get_executor()
+
+        future = executor.submit(socket.getaddrinfo, host, port, 0, socket.SOCK_STREAM)
+        results = future.result(timeout=timeout) # Raises FutureTimeout or socket.gaierror
+        ips = list(dict.fromkeys(result[4][0] for result in results)) # Deduplicated, order kept
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, ips)
+        return list(ips)
+
+    def demote(self, host: str, port: int, ip: str):
+        # Move an address that just failed to connect to the back, so later connections try the others first
+        with self._lock:
+            entry = self._entries.get((host, port))
+            if entry is not None and ip in entry[1]:
+                entry[1].remove(ip)
+                entry[1].append(ip)
+
+    def forget(self, host: str, port: int):
+        # Drop a host whose addresses all failed so the next attempt re-resolves
+        with self._lock:
+            self._entries.pop((host, port), None)
+
+class ConnectionStats:
+    """
+    Counts requests sent through the shared session, the connections opened for them,
+    and the times a pooled connection was taken with its socket still open.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.opened = 0
+        self.reused = 0
+        self._lock = threading.Lock()
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def record_open(self):
+        with self._lock:
+            self.opened += 1
+
+    def record_reuse(self):
+        with self._lock:
+            self.reused += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "connections_opened": self.opened,
+                "connections_reused": self.reused,
+                "dns_cache_hits": dns_cache.hits,
+                "dns_cache_misses": dns_cache.misses,
+            }
+
+dns_cache = DNSCache()
+connection_stats = ConnectionStats()
+
+class _CachedDNSConnectionMixin:
+    # Connect to the cached addresses in turn; TLS still uses self.host for SNI and certificate checks
+    def _new_conn(self):
+        host = self._dns_host
+        timeout = self.timeout if isinstance(self.timeout, (int, float)) else None
+        started = time.monotonic()
+        try:
+            addresses = dns_cache.resolve(host, self.port, timeout)
+        except FutureTimeout as e:
+            raise ConnectTimeoutError(self, f"DNS lookup for {host} timed out. (connect timeout={timeout})") from e
+        except OSError as e:
+            raise NewConnectionError(self, f"Failed to resolve {host}: {e}") from e
+
+        # Like socket.create_connection, but the attempts split one connect timeout (which
+        # never exceeds the caller's deadline), so a blackholed address can't use it all up
+        last_error = None
+        original_timeout = self.timeout
+        try:
+            for index, address in enumerate(addresses):
+                if timeout is not None:
+                    remaining = timeout - (time.monotonic() - started)
+                    if remaining <= 0:
+                        break
+                    self.timeout = remaining / (len(addresses) - index)
+                self._dns_host = address
+                try:
+                    sock = super()._new_conn()
+                except (ConnectTimeoutError, NewConnectionError) as e:
+                    # Later connections start with the addresses that haven't failed yet
+                    dns_cache.demote(host, self.port, address)
+                    last_error = e
+                    continue
+                connection_stats.record_open()
+                return sock
+            else:
+                dns_cache.forget(host, self.port) # Every address failed; re-resolve next time
+        finally:
+            self._dns_host = host
+            self.timeout = original_timeout
+
+        if last_error is None:
+            raise ConnectTimeoutError(self, f"Connection to {host} timed out. (connect timeout={timeout})")
+        raise last_error
+
+class _CachedDNSHTTPConnection(_CachedDNSConnectionMixin, HTTPConnection):
+    pass
+
+class _CachedDNSHTTPSConnection(_CachedDNSConnectionMixin, HTTPSConnection):
+    pass
+
+class _ReuseCountingPoolMixin:
+    # A pooled connection that still has its socket is reused; urllib3 closes dropped ones first
+    def _get_conn(self, timeout=None):
+        conn = super()._get_conn(timeout)
+        if getattr(conn, "sock", None) is not None:
+            connection_stats.record_reuse()
+        return conn
+
+class _CachedDNSHTTPConnectionPool(_ReuseCountingPoolMixin, HTTPConnectionPool):
+    ConnectionCls = _CachedDNSHTTPConnection
+
+class _CachedDNSHTTPSConnectionPool(_ReuseCountingPoolMixin, HTTPSConnectionPool):
+    ConnectionCls = _CachedDNSHTTPSConnection
+
+class PooledAdapter(HTTPAdapter):
+    """
+    Keep-alive connection pools per host, with connections opened through the DNS cache.
+    Reusing a pooled HTTPS connection also skips the TLS handshake entirely.
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _CachedDNSHTTPConnectionPool,
+            "https": _CachedDNSHTTPSConnectionPool,
+        }
+
+    def send(self, request, **kwargs):
+        connection_stats.record_request()
+        return super().send(request, **kwargs)
+
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+def get_session() -> requests.Session:
+    """
+    The shared session for this process, created on first use (and again after a fork).
+    """
+    global _session, _session_pid
+    with _session_lock:
+        if _session is None or _session_pid != os.getpid():
+            session = requests.Session()
+            session.headers.update(FETCH_HEADERS)
+            adapter = PooledAdapter(pool_connections=POOL_HOSTS, pool_maxsize=POOL_CONNECTIONS_PER_HOST)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session, _session_pid = session, os.getpid()
+        return _session
+
+def request_timeout(deadline: Optional[Deadline] = None) -> float:
+    # Per-socket-operation timeout for requests, never past the caller's deadline
+    if deadline is None:
+        return REQUEST_TIMEOUT
+    deadline.check("connect")
+    return min(REQUEST_TIMEOUT, deadline.remaining())
+
+@contextmanager
+def open_page(url: str, deadline: Optional[Deadline] = None):
+    """
+    Stream a page through the negative cache and the host's circuit breaker.
+    Request errors raised while the caller reads the body count as failures too;
+    running out of the caller's own deadline does not.
+    """
+    host = urlsplit(url).netloc.lower()
+    negative_cache.check(url)
+    circuit_breaker.check(host)
+    try:
+        with get_session().get(url, timeout=request_timeout(deadline), stream=True) as response:
+            response.raise_for_status() # Raise HTTPError for bad responses (4xx or 5xx)
+            yield response
+    except DeadlineExceeded:
+        raise
+    except requests.exceptions.RequestException as e:
+        if deadline is not None and deadline.remaining() <= 0:
+            # A timeout we forced by shrinking it to the caller's budget says nothing about the host
+            raise DeadlineExceeded(f"Deadline exceeded while fetching {url}") from e
+        negative_cache.add(url, e)
+        circuit_breaker.record_failure(host)
+        raise
+    circuit_breaker.record_success(host)
+
+def iter_body(response, deadline: Optional[Deadline] = None, chunk_size: int = STREAM_CHUNK_SIZE):
+    """
+    Yield a streamed response body as it arrives. With a deadline, the socket timeout is
+    reset to the time left before every read, and each read returns after one recv, so a
+    server trickling bytes in can't keep the download going past the caller's budget.
+    """
+    raw = response.raw
+    connection = getattr(raw, "connection", None) or getattr(raw, "_connection", None)
+    sock = getattr(connection, "sock", None)
+    if deadline is None or sock is None or not hasattr(raw, "read1"):
+        # No deadline (or an older urllib3 without read1): checked between chunks only
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            if deadline is not None:
+                deadline.check("read")
+            yield chunk
+        return
+
+    original_timeout = sock.gettimeout()
+    try:
+        while True:
+            deadline.check("read")
+            sock.settimeout(min(REQUEST_TIMEOUT, deadline.remaining()))
+            # Same translation to requests exceptions as Response.iter_content
+            try:
+                chunk = raw.read1(chunk_size, decode_content=True)
+            except ReadTimeoutError as e:
+                deadline.check("read")
+                raise requests.exceptions.ReadTimeout(e)
+            except ProtocolError as e:
+                raise requests.exceptions.ChunkedEncodingError(e)
+            except DecodeError as e:
+                raise requests.exceptions.ContentDecodingError(e)
+            except SSLError as e:
+                raise requests.exceptions.SSLError(e)
+            if not chunk:
+                return
+            yield chunk
+    finally:
+        try:
+            sock.settimeout(original_timeout) # The connection may go back to the pool
+        except OSError:
+            pass # Already closed after an error
+
+def read_capped(response, limit: int = MAX_CONTENT_BYTES, deadline: Optional[Deadline] = None) -> bytes:
+    """
+    Read a streamed response body up to `limit` bytes and stop downloading there.
+    """
+    buffer = bytearray()
+    for chunk in iter_body(response, deadline):
+        buffer += chunk
+        if len(buffer) >= limit:
+            break
+    del buffer[limit:]
+    return bytes(buffer)
+
+def fetch_html(url: str, deadline: Optional[Deadline] = None, limit: int = MAX_CONTENT_BYTES) -> str:
+    """
+    Fetch and decode a page exactly as classification sees it: byte-capped, with the
+    charset picked by detect_encoding. train_model.py uses it too, so both get the same text.
+    """
+    with open_page(url, deadline) as response:
+        content = read_capped(response, limit, deadline)
+        return decode_html(content, response.headers.get("Content-Type"), is_complete=len(content) < limit)
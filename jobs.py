@@ -0,0 +1,213 @@
+# jobs.py
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Callable, List, Optional
+
+# --- Job queue settings ---
+JOBS_DB_PATH = os.environ.get("JOBS_DB_PATH", "jobs.sqlite3") # Queue and results survive restarts here
+JOB_CONCURRENCY = int(os.environ.get("JOB_CONCURRENCY", 8)) # Classification threads per worker process
+JOB_LEASE_SECONDS = 300 # A claimed URL not finished within this is handed out again (crash/restart recovery)
+JOB_POLL_INTERVAL = 1.0 # Seconds an idle runner thread waits before checking the queue again
+JOB_INSERT_BATCH = 5000
+JOB_MAX_DEFERRALS = 10 # Fast-fails (open circuit, negative cache) put back before one is kept as the error
+JOB_MIN_DEFERRAL_SECONDS = 1.0
+
+class JobStore:
+    """
+    Persistent job queue in a local SQLite file. Pending URLs live in `items` until a
+    runner finishes them, then move to `results` in the same transaction, so a restart
+    picks up exactly the URLs that were not done. Runners lease what they claim;
+    a lease that expires (the process died) puts the URL back in play. A URL that
+    fast-failed is deferred the same way, with a lease ending when it may be retried.
+    """
+
+    def __init__(self, path: str = JOBS_DB_PATH):
+        self.path = path
+        self._local = threading.local() # sqlite3 connections can't be shared across threads
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        # A connection inherited across a fork must not be used by the child
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY, created_at REAL, total INTEGER, progressive INTEGER);
+                CREATE TABLE IF NOT EXISTS items (
+                    job_id TEXT, seq INTEGER, url TEXT, lease_until REAL DEFAULT 0,
+                    deferrals INTEGER DEFAULT 0, PRIMARY KEY (job_id, seq));
+                CREATE INDEX IF NOT EXISTS items_by_lease ON items (lease_until);
+                CREATE TABLE IF NOT EXISTS results (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT, job_id TEXT, seq INTEGER, url TEXT,
+                    result TEXT, error TEXT);
+                CREATE INDEX IF NOT EXISTS results_by_job ON results (job_id, id);
+            """)
+            # Queues created before deferrals existed
+            if "deferrals" not in {row[1] for row in conn.execute("PRAGMA table_info(items)")}:
+                conn.execute("ALTER TABLE items ADD COLUMN deferrals INTEGER DEFAULT 0")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def create(self, urls: List[str], progressive: bool = False) -> str:
+        job_id = uuid.uuid4().hex
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("INSERT INTO jobs (id, created_at, total, progressive) VALUES (?, ?, ?, ?)",
+                         (job_id, time.time(), len(urls), int(progressive)))
+            for start in range(0, len(urls), JOB_INSERT_BATCH):
+                conn.executemany("INSERT INTO items (job_id, seq, url) VALUES (?, ?, ?)",
+                                 ((job_id, seq, url) for seq, url in enumerate(urls[start:start + JOB_INSERT_BATCH], start)))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return job_id
+
+    def status(self, job_id: str) -> Optional[dict]:
+        conn = self._connect()
+        job = conn.execute("SELECT created_at, total FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if job is None:
+            return None
+        created_at, total = job
+        completed, failed = conn.execute(
+            "SELECT COUNT(*), COUNT(error) FROM results WHERE job_id = ?", (job_id,)
+        ).fetchone()
+        if completed >= total:
+            status = "done"
+        elif completed or conn.execute("SELECT 1 FROM items WHERE job_id = ? AND lease_until > 0 LIMIT 1", (job_id,)).fetchone():
+            status = "running"
+        else:
+            status = "queued"
+        return {"job_id": job_id, "status": status, "total": total, "completed": completed,
+                "failed": failed, "created_at": created_at}
+
+    def claim(self, limit: int = 1) -> list:
+        # Oldest unleased (or lease-expired) URLs first; returns (job_id, seq, url, progressive, deferrals) tuples
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute(
+                "SELECT i.job_id, i.seq, i.url, j.progressive, i.deferrals FROM items i JOIN jobs j ON j.id = i.job_id "
+                "WHERE i.lease_until < ? ORDER BY i.lease_until LIMIT ?", (now, limit)
+            ).fetchall()
+            conn.executemany("UPDATE items SET lease_until = ? WHERE job_id = ? AND seq = ?",
+                             [(now + JOB_LEASE_SECONDS, row[0], row[1]) for row in rows])
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return rows
+
+    def release(self, keys: list):
+        # Hand claimed (job_id, seq) pairs straight back to the queue, e.g. on a clean shutdown
+        self._connect().executemany("UPDATE items SET lease_until = 0 WHERE job_id = ? AND seq = ?", keys)
+
+    def defer(self, job_id: str, seq: int, delay: float):
+        # Put a claimed URL back, not to be handed out again for `delay` seconds
+        self._connect().execute(
+            "UPDATE items SET lease_until = ?, deferrals = deferrals + 1 WHERE job_id = ? AND seq = ?",
+            (time.time() + delay, job_id, seq),
+        )
+
+    def complete(self, job_id: str, seq: int, url: str, result: Optional[dict], error: Optional[str]):
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # If our lease expired and another runner already finished this URL, keep its result
+            if conn.execute("DELETE FROM items WHERE job_id = ? AND seq = ?", (job_id, seq)).rowcount:
+                conn.execute("INSERT INTO results (job_id, seq, url, result, error) VALUES (?, ?, ?, ?, ?)",
+                             (job_id, seq, url, json.dumps(result) if result is not None else None, error))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def results_after(self, job_id: str, after: int = 0, limit: int = 500) -> list:
+        # Results in completion order; `id` is the cursor a client resumes from
+        rows = self._connect().execute(
+            "SELECT id, seq, url, result, error FROM results WHERE job_id = ? AND id > ? ORDER BY id LIMIT ?",
+            (job_id, after, limit),
+        ).fetchall()
+        return [
+            {"id": row_id, "seq": seq, "url": url, "result": json.loads(result) if result is not None else None, "error": error}
+            for row_id, seq, url, result, error in rows
+        ]
+
+class JobRunner:
+    """
+    A fixed pool of threads draining the JobStore, which bounds how many URLs one
+    worker process classifies at a time.
+    """
+
+    def __init__(self, store: JobStore, classify: Callable, concurrency: int = JOB_CONCURRENCY):
+        self.store = store
+        self.classify = classify
+        self.concurrency = concurrency
+        self._threads = []
+        self._in_flight = set() # (job_id, seq) currently being classified
+        self._in_flight_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._wakeup = threading.Event()
+
+    def start(self):
+        self._stopping.clear()
+        for i in range(self.concurrency):
+            thread = threading.Thread(target=self._work, name=f"job-runner-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        # Release what's in flight so a restart resumes it right away; if the process
+        # dies instead, the same URLs come back once their lease expires
+        self._stopping.set()
+        self._wakeup.set()
+        with self._in_flight_lock:
+            in_flight = list(self._in_flight)
+        if in_flight:
+            try:
+                self.store.release(in_flight)
+            except sqlite3.Error as e:
+                print(f"DEBUG: Could not release in-flight job items: {e}")
+
+    def wake(self):
+        self._wakeup.set()
+
+    def _work(self):
+        while not self._stopping.is_set():
+            try:
+                claimed = self.store.claim()
+            except sqlite3.Error as e:
+                print(f"DEBUG: Job queue claim failed: {e}")
+                claimed = []
+            if not claimed:
+                self._wakeup.wait(JOB_POLL_INTERVAL)
+                self._wakeup.clear()
+                continue
+
+            for job_id, seq, url, progressive, deferrals in claimed:
+                with self._in_flight_lock:
+                    self._in_flight.add((job_id, seq))
+                result, error, retry_after = None, None, None
+                try:
+                    result = self.classify(url, progressive=bool(progressive))
+                except Exception as e:
+                    error = str(getattr(e, "detail", e)) # HTTPException carries its message in .detail
+                    # An open circuit or a negative-cache hit says "not now", not "this URL is broken"
+                    retry_after = getattr(e, "retry_after", getattr(e.__cause__, "retry_after", None))
+                try:
+                    if retry_after is not None and deferrals < JOB_MAX_DEFERRALS:
+                        self.store.defer(job_id, seq, max(retry_after, JOB_MIN_DEFERRAL_SECONDS))
+                    else:
+                        self.store.complete(job_id, seq, url, result, error)
+                except sqlite3.Error as e:
+                    print(f"DEBUG: Could not record job result for {url}: {e}")
+                with self._in_flight_lock:
+                    self._in_flight.discard((job_id, seq))
@@ -1,315 +1,333 @@
 # main.py
 from fastapi import FastAPI, HTTPException
-from fastapi.responses import HTMLResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import HTMLResponse, Response, StreamingResponse
 from fastapi.requests import Request
 from pydantic import BaseModel
 import requests
-from bs4 import BeautifulSoup
 import tldextract
-from typing import Optional
+from typing import List, Optional
+import asyncio
+import gzip
+import hashlib
+import json
+import os
 import re
-import joblib # For loading ML models
-import numpy as np # For numerical operations with ML probabilities
+from classifier import ML_CONFIDENCE_THRESHOLD, MAX_TOP_K, classify_html, classify_html_pass
+from fetcher import (
+    MAX_CONTENT_BYTES, CHARSET_DETECT_SAMPLE_BYTES, Deadline, DeadlineExceeded, CircuitOpenError,
+    open_page, fetch_html, detect_encoding, decode_html, iter_body, connection_stats,
+)
+from result_cache import result_cache
+from jobs import JobStore, JobRunner
 
 app = FastAPI(title="Website Type Classifier API")
 
 class Website(BaseModel):
     url: str
+    progressive: bool = False # Classify from the <head> and first chunk of body, fetching more only if needed
+    deadline_ms: Optional[int] = None # Total latency budget for DNS, connect, read and parse
+    top_k: int = 0 # Also return the k most probable classes and the terms behind the top one
 
-# Comprehensive website types with refined keywords
-WEBSITE_TYPES = {
-    "e-commerce": ["shop", "cart", "buy", "store", "product", "price", "checkout", "add to cart", "payment", "deal", "coupon", "discount"],
-    "blog": ["blog", "post", "article", "read more", "comment", "author", "category", "tag", "subscribe", "newsletter"],
-    "news": ["news", "breaking", "headline", "report", "latest", "update", "journal", "editorial", "politics", "economy", "world"],
-    "portfolio": ["portfolio", "project", "work", "gallery", "showcase", "creative", "design", "artist", "resume"],
-    "forum": ["forum", "thread", "post", "discussion", "reply", "community", "board", "group", "topic", "members"],
-    "corporate": ["company", "about us", "services", "contact us", "careers", "business", "enterprise", "solution", "investor"],
-    "personal": ["about me", "personal", "bio", "resume", "cv", "profile", "hobby", "my story"],
-    "educational": ["course", "learn", "university", "school", "education", "study", "academy", "lecture", "student", "syllabus"],
-    "government": ["gov", "government", "official", "public", "department", "agency", "state", "policy", "citizen", "council"],
-    "non-profit": ["donate", "charity", "non-profit", "volunteer", "mission", "cause", "foundation", "support", "fundraiser"],
-    "social media": ["follow", "share", "like", "post", "profile", "connect", "network", "friend", "feed", "community"],
-    "entertainment": ["video", "movie", "music", "stream", "watch", "play", "entertainment", "show", "artist", "album"],
-    "wiki": ["wiki", "encyclopedia", "knowledge", "edit", "reference", "information", "article", "fandom"],
-    "job board": ["job", "career", "hiring", "vacancy", "apply", "recruitment", "employment", "resume", "positions", "openings"],
-    "directory": ["directory", "listing", "search", "find", "businesses", "categories", "reviews", "local", "contact"],
-    "health": ["health", "medical", "doctor", "hospital", "wellness", "clinic", "patient", "therapy", "disease", "symptom"],
-    "travel": ["travel", "tour", "booking", "destination", "hotel", "flight", "vacation", "itinerary", "explore", "journey"],
-    "real estate": ["property", "real estate", "listing", "home", "rent", "buy", "mortgage", "broker", "house", "apartment"],
-    "video streaming": ["stream", "video", "watch", "channel", "subscribe", "live", "episode", "series", "tv"],
-    "gaming": ["game", "gaming", "play", "score", "leaderboard", "multiplayer", "console", "esports", "gamer", "level"],
-    "event": ["event", "ticket", "festival", "conference", "seminar", "webinar", "schedule", "register", "date"],
-    "food": ["recipe", "food", "cooking", "restaurant", "menu", "cuisine", "dine", "chef", "ingredient"],
-    "sports": ["sport", "team", "score", "league", "match", "athlete", "tournament", "game", "championship"],
-}
-
-# --- Load the pre-trained ML model and vectorizer ---
-vectorizer = None
-model = None
-trained_classes = []
-
-try:
-    vectorizer = joblib.load('tfidf_vectorizer.pkl')
-    model = joblib.load('website_classifier_model.pkl')
-    trained_classes = model.classes_ # Get the classes the model was trained on
-    print("--- Machine learning model loaded successfully. ---")
-except FileNotFoundError:
-    print("\n--- WARNING: ML model files (tfidf_vectorizer.pkl, website_classifier_model.pkl) not found. ---")
-    print("--- Please run 'python train_model.py' first to train and save the model. ---")
-    print("--- The API will fall back to heuristic classification only, which may be less accurate. ---\n")
-except Exception as e:
-    print(f"\n--- ERROR loading ML model: {e}. Falling back to heuristic classification only. ---\n")
-
-def classify_website(url: str) -> dict:
+class JobRequest(BaseModel):
+    urls: List[str]
+    progressive: bool = False
+
+# --- Progressive mode settings ---
+PROGRESSIVE_INITIAL_BODY_BYTES = 16 * 1024 # Body bytes read after </head> before the first pass
+PROGRESSIVE_MAX_HEAD_BYTES = 64 * 1024 # Give up looking for </head> after this many bytes
+PROGRESSIVE_MAX_PASSES = 2 # Doubling passes before one last pass over the full (capped) page
+HEAD_END_PATTERN = re.compile(rb"</head\s*>|<body[\s>]", re.I)
+
+# --- Parse budget settings ---
+PARSE_BYTES_PER_SECOND = 256 * 1024 # Parse + classify throughput, about half of what markup-heavy pages (the slow case) reach locally
+MIN_PARSE_BYTES = 16 * 1024 # Always worth trying; the deadline check after parsing catches a miss
+
+def _affordable_bytes(deadline: Optional[Deadline] = None) -> int:
+    # Largest prefix we can still expect to parse and classify within the deadline
+    if deadline is None:
+        return MAX_CONTENT_BYTES
+    affordable = int(deadline.remaining() * PARSE_BYTES_PER_SECOND)
+    return max(MIN_PARSE_BYTES, min(MAX_CONTENT_BYTES, affordable))
+
+def _find_body_start(buffer: bytearray, search_from: int = 0) -> int:
+    # Offset just past </head> (or at <body>), or -1 if the head hasn't closed yet
+    match = HEAD_END_PATTERN.search(buffer, max(0, search_from - 16))
+    return match.end() if match else -1
+
+def _classify_progressive(url: str, suffix: str, deadline: Optional[Deadline] = None, top_k: int = 0) -> tuple:
+    """
+    Stream the page and classify it from the <head> plus the first chunk of body.
+    The window doubles only while the model stays below ML_CONFIDENCE_THRESHOLD,
+    and the download is abandoned as soon as a pass is confident enough or the model's
+    text is already full. After PROGRESSIVE_MAX_PASSES the rest of the page is read in one
+    go, so an unconfident page costs about one full pass, not a dozen re-parses.
+    If the deadline runs out after at least one pass, the last pass finished in time is
+    returned, and no larger window is read than can be parsed in the time left.
+    Returns the result and whether the deadline cut it short.
+    """
+    with open_page(url, deadline) as response:
+        content_type = response.headers.get("Content-Type")
+        encoding = None
+        chunks = iter_body(response, deadline)
+
+        buffer = bytearray()
+        body_start = -1
+        target = None
+        exhausted = False
+        result = None
+        passes = 0
+
+        while True:
+            try:
+                for chunk in chunks:
+                    scanned = len(buffer)
+                    buffer += chunk
+                    if body_start < 0:
+                        body_start = _find_body_start(buffer, scanned)
+                        if body_start < 0 and len(buffer) >= PROGRESSIVE_MAX_HEAD_BYTES:
+                            body_start = len(buffer) # No recognisable head; treat what we have as one
+                    if target is None and body_start >= 0:
+                        target = body_start + PROGRESSIVE_INITIAL_BODY_BYTES
+                    if len(buffer) >= MAX_CONTENT_BYTES:
+                        exhausted = True # Same cap as the non-progressive path
+                        break
+                    if target is not None and len(buffer) >= target:
+                        break
+                else:
+                    exhausted = True
+            except DeadlineExceeded:
+                if result is not None:
+                    return result, True # Out of budget mid-read: answer with the best pass so far
+                raise
+
+            if deadline is not None and deadline.remaining() <= 0:
+                if result is not None:
+                    return result, True # Out of budget: answer with the best pass so far
+                deadline.check("read")
+
+            content = bytes(buffer)
+            pass_encoding = encoding or detect_encoding(content, content_type, is_complete=exhausted)
+            # Reuse the detection once it has seen the whole sample (or page); a shorter
+            # window, pure ASCII so far, could still turn out not to be UTF-8
+            if exhausted or len(content) >= CHARSET_DETECT_SAMPLE_BYTES:
+                encoding = pass_encoding
+            html = decode_html(content, encoding=pass_encoding)
+            pass_result, ml_confidence_raw, text_is_full = classify_html_pass(url, html, suffix, top_k=top_k)
+            if deadline is not None and deadline.remaining() <= 0:
+                if result is not None:
+                    return result, True # This pass finished too late: the previous one stands
+                deadline.check("parse")
+            result = pass_result
+            # A full text means later bytes can't change the model's input (see featurize.py)
+            if exhausted or text_is_full or ml_confidence_raw >= ML_CONFIDENCE_THRESHOLD:
+                return result, False
+
+            # Not confident yet: keep streaming, doubling the window each pass
+            passes += 1
+            next_target = len(buffer) * 2 if passes < PROGRESSIVE_MAX_PASSES else MAX_CONTENT_BYTES
+            next_target = min(next_target, _affordable_bytes(deadline))
+            if next_target <= len(buffer):
+                return result, True # No time left to parse a bigger window
+            target = next_target
+
+def classify_website(url: str, progressive: bool = False, deadline_ms: Optional[int] = None, top_k: int = 0) -> dict:
     # Ensure URL has scheme
     if not url.startswith(("http://", "https://")):
         url = "https://" + url
 
+    # Shared by all workers on this host, see result_cache.py
+    top_k = min(max(top_k, 0), MAX_TOP_K)
+    cache_key = f"{url}|progressive={int(progressive)}"
+    if top_k:
+        cache_key += f"|top_k={top_k}"
+    cached_result = result_cache.get(cache_key)
+    if cached_result is not None:
+        return cached_result
+
+    deadline = Deadline.from_ms(deadline_ms)
+
     try:
         # Extract domain information
         extracted = tldextract.extract(url)
         suffix = extracted.suffix
 
-        # Fetch website content
-        headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"}
-        response = requests.get(url, headers=headers, timeout=15)
-        response.raise_for_status() # Raise HTTPError for bad responses (4xx or 5xx)
-
-        # Parse HTML content
-        soup = BeautifulSoup(response.text, "html.parser")
-        
-        # Extract text and metadata
-        text = soup.get_text(separator=" ", strip=True).lower()
-        title = soup.find("title").get_text().lower() if soup.find("title") else ""
-        meta_description = ""
-        for tag in soup.find_all("meta"):
-            if tag.get("name") == "description":
-                meta_description = tag.get("content", "").lower()
-                break
-        
-        # Clean up excessive whitespace
-        combined_text_raw = f"{title} {meta_description} {text}"
-        combined_text = re.sub(r'\s+', ' ', combined_text_raw).strip()
-
-        # Initialize heuristic scores
-        heuristic_scores = {type_name: 0 for type_name in WEBSITE_TYPES}
-
-        # Domain-based heuristics
-        if suffix in ["edu", "ac"]:
-            heuristic_scores["educational"] += 3
-        if suffix == "gov":
-            heuristic_scores["government"] += 3
-        if suffix == "org" and "donate" in combined_text:
-            heuristic_scores["non-profit"] += 2
-
-        # Keyword-based scoring (using a portion of text for efficiency)
-        text_for_heuristics = combined_text[:5000] # Use first 5000 chars for heuristic speed
-        for type_name, keywords in WEBSITE_TYPES.items():
-            for keyword in keywords:
-                if keyword in text_for_heuristics:
-                    heuristic_scores[type_name] += 1
-
-        # Structural checks using regex for class names
-        if soup.find_all(["form", "input", "select"]) and any(k in text_for_heuristics for k in ["cart", "checkout"]):
-            heuristic_scores["e-commerce"] += 3
-        if soup.find_all(["article", "section"]) and "blog" in text_for_heuristics:
-            heuristic_scores["blog"] += 3
-        if soup.find_all(["div"], class_=re.compile(r"gallery|portfolio")):
-            heuristic_scores["portfolio"] += 3
-        if soup.find_all(["form"], class_=re.compile(r"search")) and "directory" in text_for_heuristics:
-            heuristic_scores["directory"] += 3
-        if soup.find_all(["div"], class_=re.compile(r"job|career|hiring|vacanc")):
-            heuristic_scores["job board"] += 3
-        if soup.find_all(["a"], href=re.compile(r"wiki|edit")):
-            heuristic_scores["wiki"] += 3
-        if soup.find_all(["button", "a"], string=re.compile(r"donate", re.I)):
-            heuristic_scores["non-profit"] += 3
-        if soup.find_all(["video", "iframe"]) and any(k in text_for_heuristics for k in ["stream", "watch"]):
-            heuristic_scores["video streaming"] += 3
-        if soup.find_all(["div"], class_=re.compile(r"game|score|gaming")):
-            heuristic_scores["gaming"] += 3
-        if soup.find_all(["a", "button"], string=re.compile(r"ticket|event|conference|festival", re.I)):
-            heuristic_scores["event"] += 3
-
-        # --- ML-based Prediction ---
-        ml_type_prediction = "unknown"
-        ml_confidence_raw = 0.0
-        
-        ML_CONFIDENCE_THRESHOLD = 0.80 # Threshold for prioritizing ML prediction
-
-        if model and vectorizer:
-            try:
-                # Transform the combined_text (full text) for ML prediction
-                text_features = vectorizer.transform([combined_text])
-                
-                # Get probability predictions for all classes
-                probabilities = model.predict_proba(text_features)[0]
-                
-                # Find the class with the highest probability
-                max_prob_idx = np.argmax(probabilities)
-                ml_type_prediction = trained_classes[max_prob_idx]
-                ml_confidence_raw = probabilities[max_prob_idx]
-                    
-            except Exception as e:
-                print(f"DEBUG: Error during ML prediction for {url}: {e}")
-                # ML prediction failed, will proceed with heuristics
-        
-        # --- Final Determination ---
-        final_type = "unknown"
-        final_confidence = 0.0
-
-        # Prioritize ML prediction if it's confident enough
-        if ml_confidence_raw >= ML_CONFIDENCE_THRESHOLD:
-            final_type = ml_type_prediction
-            final_confidence = float(ml_confidence_raw)
+        if progressive:
+            result, cut_short = _classify_progressive(url, suffix, deadline, top_k)
         else:
-            # Fallback to heuristic scores if ML is not confident or not available
-            max_heuristic_score = max(heuristic_scores.values())
-
-            if max_heuristic_score > 0:
-                best_heuristic_type = max(heuristic_scores, key=heuristic_scores.get)
-                total_heuristic_score = sum(heuristic_scores.values())
-                
-                # Normalize heuristic score to give an approximate confidence (0-1)
-                # This is a simple normalization; a more complex one might use domain knowledge
-                # For example, a perfect heuristic score might get 0.7 confidence by default
-                heuristic_confidence_normalized = (max_heuristic_score / total_heuristic_score) if total_heuristic_score > 0 else 0.0
-                
-                # If ML was attempted but not confident, average with heuristic or take the best
-                if model and ml_confidence_raw > 0: # If ML provided some (low confidence) probability
-                    final_confidence = np.mean([heuristic_confidence_normalized, ml_confidence_raw])
-                    # If ML has a specific type, but heuristic is also strong, prefer ML if it's not too far off
-                    if ml_type_prediction != "unknown" and ml_confidence_raw > heuristic_confidence_normalized:
-                        final_type = ml_type_prediction
-                    else:
-                        final_type = best_heuristic_type
-                else: # Only heuristic is available
-                    final_type = best_heuristic_type
-                    final_confidence = heuristic_confidence_normalized
-            
-            # If still no strong signal, default to unknown
-            if final_type == "unknown" and final_confidence == 0.0 and ml_confidence_raw < ML_CONFIDENCE_THRESHOLD:
-                 # If even after averaging, confidence is low, and ML wasn't confident.
-                 # Consider the highest heuristic as a "best guess" but with low confidence.
-                 if max_heuristic_score > 0:
-                    final_type = max(heuristic_scores, key=heuristic_scores.get)
-                    final_confidence = max_heuristic_score / (sum(WEBSITE_TYPES[final_type]) * 2) if sum(WEBSITE_TYPES[final_type]) > 0 else 0.0 # Example simple scaling
-                    final_confidence = min(0.49, final_confidence) # Ensure it's explicitly below 0.5 if not confident
-                 else:
-                     return {"url": url, "type": "unknown", "confidence": 0.0}
-
-        return {"url": url, "type": final_type, "confidence": round(float(final_confidence), 2)}
+            # Fetch website content (only the byte-capped prefix we actually use,
+            # and no more than can be parsed before the deadline)
+            limit = _affordable_bytes(deadline)
+            html = fetch_html(url, deadline, limit)
+            cut_short = limit < MAX_CONTENT_BYTES
+
+            if deadline is not None:
+                deadline.check("parse")
+            result, _ = classify_html(url, html, suffix, top_k=top_k)
+            if deadline is not None:
+                deadline.check("parse")
     
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=f"Deadline exceeded for {url}: {str(e)}")
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=f"Error accessing website {url}: {str(e)}", headers={"Retry-After": str(max(1, int(e.retry_after)))}) from e
     except requests.exceptions.RequestException as e:
-        raise HTTPException(status_code=400, detail=f"Error accessing website {url}: {str(e)}")
+        # Failures are remembered by fetcher's negative cache and circuit breaker
+        # (chained so the job runner can tell a fast-fail from a real fetch error)
+        raise HTTPException(status_code=400, detail=f"Error accessing website {url}: {str(e)}") from e
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An unexpected error occurred while processing {url}: {str(e)}")
 
+    # An answer the deadline cut short (less of the page, or an earlier pass) isn't worth sharing
+    if not cut_short:
+        result_cache.set(cache_key, result)
+    return result
+
 @app.post("/classify", response_model=dict)
 async def classify_website_type(website: Website):
     """
     Classify the type of a website based on its URL.
     Returns the predicted website type and confidence score.
     """
-    result = classify_website(website.url)
+    # The fetch and parse block, so they run off the event loop that also serves the job streams
+    result = await run_in_threadpool(classify_website, website.url, progressive=website.progressive,
+                                     deadline_ms=website.deadline_ms, top_k=website.top_k)
     return result
 
+# --- Asynchronous jobs for large URL lists ---
+JOB_STREAM_POLL_INTERVAL = 0.5 # Seconds between checks for new results while streaming
+JOB_STREAM_BATCH = 500
+
+job_store = JobStore()
+job_runner = JobRunner(job_store, classify_website)
+
+@app.on_event("startup")
+def start_job_runner():
+    # Runs in every worker process, after any pre-fork, so each gets its own threads
+    job_runner.start()
+
+@app.on_event("shutdown")
+def stop_job_runner():
+    job_runner.stop()
+
+@app.post("/jobs", response_model=dict)
+async def submit_job(job: JobRequest):
+    """
+    Queue a list of URLs for background classification.
+    Returns a job id to poll (GET /jobs/{job_id}) or stream results from (GET /jobs/{job_id}/results).
+    """
+    if not job.urls:
+        raise HTTPException(status_code=400, detail="A job needs at least one URL.")
+    job_id = await run_in_threadpool(job_store.create, job.urls, job.progressive)
+    job_runner.wake()
+    return {"job_id": job_id, "total": len(job.urls)}
+
+@app.get("/jobs/{job_id}", response_model=dict)
+async def get_job_status(job_id: str):
+    """
+    Report a job's progress: queued, running or done, with completed and failed counts.
+    """
+    status = await run_in_threadpool(job_store.status, job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found.")
+    return status
+
+@app.get("/jobs/{job_id}/results")
+async def stream_job_results(job_id: str, request: Request, after: int = 0, format: str = "ndjson"):
+    """
+    Stream a job's results as they complete, as NDJSON (default) or Server-Sent Events
+    (`format=sse` or `Accept: text/event-stream`). Each result carries an `id`; pass the
+    last one seen as `after` (or SSE's Last-Event-ID) to resume. The stream ends when the job is done.
+    """
+    if await run_in_threadpool(job_store.status, job_id) is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found.")
+
+    use_sse = format == "sse" or "text/event-stream" in request.headers.get("accept", "")
+    last_event_id = request.headers.get("last-event-id")
+    if use_sse and last_event_id and last_event_id.isdigit():
+        after = int(last_event_id)
+
+    async def result_stream():
+        cursor = after
+        while True:
+            # Read the status before the rows, so results written in between are never skipped
+            status = await run_in_threadpool(job_store.status, job_id)
+            rows = await run_in_threadpool(job_store.results_after, job_id, cursor, JOB_STREAM_BATCH)
+            for row in rows:
+                cursor = row["id"]
+                line = json.dumps(row)
+                yield f"id: {cursor}\ndata: {line}\n\n" if use_sse else f"{line}\n"
+            if rows:
+                continue
+            if status["status"] == "done" or await request.is_disconnected():
+                break
+            await asyncio.sleep(JOB_STREAM_POLL_INTERVAL)
+
+    media_type = "text/event-stream" if use_sse else "application/x-ndjson"
+    return StreamingResponse(result_stream(), media_type=media_type)
+
+@app.get("/stats", response_model=dict)
+async def fetch_stats():
+    """
+    Report how many outbound connections this worker opened versus reused,
+    along with DNS and result cache hits and misses.
+    """
+    return {**connection_stats.snapshot(), **result_cache.snapshot()}
+
+# --- Static UI ---
+# Plain JS/CSS in static/, read once at startup and kept gzip-compressed in memory.
+# Assets are linked with a content version, so browsers may cache them for a year;
+# the page itself is revalidated with its ETag on every visit.
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+STATIC_MEDIA_TYPES = {".html": "text/html; charset=utf-8", ".css": "text/css; charset=utf-8", ".js": "application/javascript; charset=utf-8"}
+STATIC_ASSET_MAX_AGE = 365 * 24 * 3600
+
+def _static_asset(name: str, body: bytes) -> dict:
+    etag = hashlib.sha256(body).hexdigest()[:16]
+    return {
+        "body": body,
+        "gzip": gzip.compress(body, compresslevel=9),
+        "etag": f'"{etag}"',
+        "gzip_etag": f'"{etag}-gz"', # Each encoding is a different representation
+        "media_type": STATIC_MEDIA_TYPES.get(os.path.splitext(name)[1], "application/octet-stream"),
+    }
+
+def _load_static_assets() -> dict:
+    assets = {}
+    for name in os.listdir(STATIC_DIR):
+        with open(os.path.join(STATIC_DIR, name), "rb") as f:
+            assets[name] = _static_asset(name, f.read())
+    # Version the asset links in index.html by their content
+    asset_version = hashlib.sha256("".join(assets[name]["etag"] for name in sorted(assets) if name != "index.html").encode()).hexdigest()[:12]
+    assets["index.html"] = _static_asset("index.html", assets["index.html"]["body"].replace(b"{{asset_version}}", asset_version.encode()))
+    return assets
+
+static_assets = _load_static_assets()
+
+def _static_response(request: Request, asset: dict, cache_control: str) -> Response:
+    use_gzip = "gzip" in request.headers.get("accept-encoding", "")
+    etag = asset["gzip_etag"] if use_gzip else asset["etag"]
+    headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=asset["gzip"], media_type=asset["media_type"], headers=headers)
+    return Response(content=asset["body"], media_type=asset["media_type"], headers=headers)
+
+@app.get("/static/{name}")
+async def serve_static(name: str, request: Request):
+    """
+    Serve a UI asset (JavaScript or CSS), compressed and cacheable.
+    """
+    asset = static_assets.get(name)
+    if asset is None or name == "index.html":
+        raise HTTPException(status_code=404, detail="Not found.")
+    return _static_response(request, asset, f"public, max-age={STATIC_ASSET_MAX_AGE}, immutable")
+
 @app.get("/", response_class=HTMLResponse)
 async def serve_ui(request: Request):
     """
-    Serve the React-based UI for the website type classifier.
-    """
-    html_content = """
-    <!DOCTYPE html>
-    <html lang="en">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>Website Type Classifier</title>
-        <script src="https://cdn.jsdelivr.net/npm/react@18.2.0/umd/react.production.min.js"></script>
-        <script src="https://cdn.jsdelivr.net/npm/react-dom@18.2.0/umd/react-dom.production.min.js"></script>
-        <script src="https://cdn.jsdelivr.net/npm/axios@1.6.2/dist/axios.min.js"></script>
-        <script src="https://cdn.tailwindcss.com"></script>
-        <script src="https://cdn.jsdelivr.net/npm/@babel/standalone@7.23.6/babel.min.js"></script>
-    </head>
-    <body class="bg-gray-100 min-h-screen flex items-center justify-center">
-        <div id="root"></div>
-        <script type="text/babel">
-            function App() {
-                const [url, setUrl] = React.useState('');
-                const [result, setResult] = React.useState(null);
-                const [error, setError] = React.useState(null);
-                const [loading, setLoading] = React.useState(false);
-
-                const handleSubmit = async () => {
-                    setError(null);
-                    setResult(null);
-                    setLoading(true);
-
-                    try {
-                        const response = await axios.post('/classify', { url });
-                        setResult(response.data);
-                    } catch (err) {
-                        setError(err.response?.data?.detail || 'An error occurred while classifying the website.');
-                    } finally {
-                        setLoading(false);
-                    }
-                };
-
-                return (
-                    <div className="max-w-lg w-full mx-auto p-6 bg-white rounded-lg shadow-lg">
-                        <h1 className="text-3xl font-bold text-center text-gray-800 mb-6">Website Type Classifier</h1>
-                        <div className="mb-4">
-                            <label htmlFor="url" className="block text-sm font-medium text-gray-700 mb-2">
-                                Enter Website URL
-                            </label>
-                        <input
-                                type="text"
-                                id="url"
-                                value={url}
-                                onChange={(e) => setUrl(e.target.value)}
-                                placeholder="e.g., https://www.example.com"
-                                className="w-full p-3 border border-gray-300 rounded-lg focus:outline-none focus:ring-2 focus:ring-blue-500"
-                            />
-                        </div>
-                        <button
-                            onClick={handleSubmit}
-                            disabled={loading || !url}
-                            className={`w-full py-3 rounded-lg text-white font-semibold transition-colors ${
-                                loading || !url ? 'bg-gray-400 cursor-not-allowed' : 'bg-blue-600 hover:bg-blue-700'
-                            }`}
-                        >
-                            {loading ? 'Classifying...' : 'Classify Website'}
-                        </button>
-                        {result && (
-                            <div className="mt-6 p-4 bg-gray-50 rounded-lg">
-                                <h2 className="text-lg font-semibold text-gray-800">Result</h2>
-                                <p className="text-gray-600">
-                                    <span className="font-medium">URL:</span> {result.url}
-                                </p>
-                                <p className="text-gray-600">
-                                    <span className="font-medium">Type:</span> {result.type.charAt(0).toUpperCase() + result.type.slice(1)}
-                                </p>
-                                <p className="text-gray-600">
-                                    <span className="font-medium">Confidence:</span> {(result.confidence * 100).toFixed(0)}%
-                                </p>
-                            </div>
-                        )}
-                        {error && (
-                            <div className="mt-6 p-4 bg-red-50 rounded-lg">
-                                <p className="text-red-600">{error}</p>
-                            </div>
-                        )}
-                        <p className="mt-6 text-center text-sm text-gray-500">
-                            Powered by FastAPI & xAI
-                        </p>
-                    </div>
-                );
-            }
-
-            ReactDOM.render(<App />, document.getElementById('root'));
-        </script>
-    </body>
-    </html>
+    Serve the web UI for the website type classifier.
     """
-    return HTMLResponse(content=html_content)
\ No newline at end of file
+    return _static_response(request, static_assets["index.html"], "no-cache")
@@ -0,0 +1,76 @@
+# result_cache.py
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+# --- Result cache settings ---
+RESULT_CACHE_PATH = os.environ.get("RESULT_CACHE_PATH", "result_cache.sqlite3") # Same file for every worker on the host
+RESULT_CACHE_TTL = int(os.environ.get("RESULT_CACHE_TTL", 3600)) # Seconds; 0 disables the cache
+RESULT_CACHE_PURGE_EVERY = 1000 # Writes between sweeps of expired rows
+
+class ResultCache:
+    """
+    Classification results in a local SQLite file, so every worker process on the
+    host shares one cache instead of each warming its own. WAL mode lets readers
+    in other workers proceed while one of them writes.
+    """
+
+    def __init__(self, path: str = RESULT_CACHE_PATH, ttl: int = RESULT_CACHE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._local = threading.local() # sqlite3 connections can't be shared across threads
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        # A connection inherited across a fork must not be used by the child
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, expires_at REAL, value TEXT)")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def get(self, key: str) -> Optional[dict]:
+        if self.ttl <= 0:
+            return None
+        try:
+            row = self._connect().execute(
+                "SELECT value FROM results WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"DEBUG: Result cache read failed for {key}: {e}")
+            row = None
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key: str, value: dict):
+        if self.ttl <= 0:
+            return
+        try:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO results (key, expires_at, value) VALUES (?, ?, ?)",
+                (key, time.time() + self.ttl, json.dumps(value)),
+            )
+            self._writes += 1
+            if self._writes % RESULT_CACHE_PURGE_EVERY == 0:
+                conn.execute("DELETE FROM results WHERE expires_at <= ?", (time.time(),))
+        except sqlite3.Error as e:
+            # A busy or read-only cache file shouldn't fail the classification itself
+            print(f"DEBUG: Result cache write failed for {key}: {e}")
+
+    def snapshot(self) -> dict:
+        # Counters are per worker; the stored results are shared
+        return {"result_cache_hits": self.hits, "result_cache_misses": self.misses}
+
+result_cache = ResultCache()
@@ -0,0 +1,128 @@
+// Website Type Classifier UI. Plain browser JavaScript: nothing is compiled at load time.
+(function () {
+    "use strict";
+
+    var input = document.getElementById("urls");
+    var button = document.getElementById("classify");
+    var progress = document.getElementById("progress");
+    var errorBox = document.getElementById("error");
+    var table = document.getElementById("results");
+    var rows = table.querySelector("tbody");
+
+    function parseUrls() {
+        return input.value.split("\n").map(function (line) { return line.trim(); }).filter(Boolean);
+    }
+
+    function capitalize(text) {
+        return text.charAt(0).toUpperCase() + text.slice(1);
+    }
+
+    function addPendingRow(url) {
+        var row = rows.insertRow();
+        row.insertCell().textContent = url;
+        var type = row.insertCell();
+        type.textContent = "Classifying...";
+        type.className = "pending";
+        row.insertCell().className = "pending";
+        return row;
+    }
+
+    function fillRow(row, result, error) {
+        if (error) {
+            row.cells[1].textContent = error;
+            row.cells[1].className = "failed";
+            row.cells[2].textContent = "";
+            row.cells[2].className = "";
+            return;
+        }
+        row.cells[0].textContent = result.url;
+        row.cells[1].textContent = capitalize(result.type);
+        row.cells[1].className = "";
+        row.cells[2].textContent = (result.confidence * 100).toFixed(0) + "%";
+        row.cells[2].className = "";
+    }
+
+    async function postJson(path, body) {
+        var response = await fetch(path, {
+            method: "POST",
+            headers: { "Content-Type": "application/json" },
+            body: JSON.stringify(body)
+        });
+        var data = await response.json().catch(function () { return {}; });
+        if (!response.ok) {
+            throw new Error(data.detail || "An error occurred while classifying the website.");
+        }
+        return data;
+    }
+
+    async function classifyOne(url, row) {
+        try {
+            fillRow(row, await postJson("/classify", { url: url }));
+        } catch (err) {
+            fillRow(row, null, err.message);
+        }
+    }
+
+    async function classifyMany(urls, pendingRows) {
+        // Submit one job, then fill in rows as the NDJSON result stream delivers them
+        var job = await postJson("/jobs", { urls: urls });
+        var response = await fetch("/jobs/" + job.job_id + "/results");
+        if (!response.ok || !response.body) {
+            throw new Error("Could not read results for job " + job.job_id + ".");
+        }
+        var reader = response.body.getReader();
+        var decoder = new TextDecoder();
+        var buffered = "";
+        var finished = 0;
+        for (;;) {
+            var chunk = await reader.read();
+            if (chunk.done) {
+                break;
+            }
+            buffered += decoder.decode(chunk.value, { stream: true });
+            var newline;
+            while ((newline = buffered.indexOf("\n")) >= 0) {
+                var line = buffered.slice(0, newline);
+                buffered = buffered.slice(newline + 1);
+                if (!line) {
+                    continue;
+                }
+                var item = JSON.parse(line);
+                fillRow(pendingRows[item.seq], item.result, item.error);
+                finished += 1;
+                progress.textContent = finished + " of " + urls.length + " classified";
+            }
+        }
+    }
+
+    async function handleSubmit() {
+        var urls = parseUrls();
+        errorBox.hidden = true;
+        rows.textContent = "";
+        table.hidden = false;
+        button.disabled = true;
+        button.textContent = "Classifying...";
+        progress.hidden = urls.length < 2;
+        progress.textContent = "0 of " + urls.length + " classified";
+
+        var pendingRows = urls.map(addPendingRow);
+        try {
+            if (urls.length === 1) {
+                await classifyOne(urls[0], pendingRows[0]);
+            } else {
+                await classifyMany(urls, pendingRows);
+            }
+        } catch (err) {
+            errorBox.textContent = err.message;
+            errorBox.hidden = false;
+        } finally {
+            button.disabled = parseUrls().length === 0;
+            button.textContent = "Classify Website";
+        }
+    }
+
+    input.addEventListener("input", function () {
+        button.disabled = parseUrls().length === 0;
+    });
+    button.addEventListener("click", handleSubmit);
+}());
@@ -9,7 +9,8 @@ import requests
 from bs4 import BeautifulSoup
 import time
 import random
-import re # Added for URL cleaning
+from featurize import build_text # Shared with classifier.py so training and serving see the same text
+from fetcher import fetch_html, connection_stats # Same fetch, byte cap and charset handling as classification
 
 print("--- Starting Model Training Script ---")
 
@@ -470,7 +471,6 @@ df = pd.DataFrame(training_data_raw)
 
 # --- 2. Scrape Content ---
 scraped_texts = []
-headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"}
 
 print("Scraping content for training data (this may take a while and show errors for some URLs)...")
 for index, row in df.iterrows():
@@ -480,26 +480,14 @@ for index, row in df.iterrows():
         if not url.startswith(("http://", "https://")):
             url = "https://" + url
 
-        response = requests.get(url, headers=headers, timeout=15) # Increased timeout
-        response.raise_for_status() # Raise HTTPError for bad responses (4xx or 5xx)
+        # Shared keep-alive session and DNS cache; raises for 4xx/5xx like classification does
+        html = fetch_html(url)
         
-        soup = BeautifulSoup(response.text, "html.parser")
+        soup = BeautifulSoup(html, "html.parser")
         
-        # Extract text, title, and meta description
-        text = soup.get_text(separator=" ", strip=True).lower()
-        title = soup.find("title").get_text().lower() if soup.find("title") else ""
-        meta_description = ""
-        for tag in soup.find_all("meta"):
-            if tag.get("name") == "description":
-                meta_description = tag.get("content", "").lower()
-                break
-        
-        # Clean up excessive whitespace
-        combined_text = f"{title} {meta_description} {text}"
-        combined_text = re.sub(r'\s+', ' ', combined_text).strip()
-        
-        # Limit text length to prevent memory issues with very large pages
-        scraped_texts.append(combined_text[:10000]) # Take first 10,000 characters
+        # Title, meta description and page text, normalized and limited to
+        # MAX_FEATURE_CHARS (10,000) in one pass; classifier.py builds it the same way
+        scraped_texts.append(build_text(soup))
         print(f"Scraped successfully: {url}")
     except requests.exceptions.RequestException as e:
         print(f"Error scraping {url}: {e}. Skipping this URL for training.")
@@ -511,6 +499,10 @@ for index, row in df.iterrows():
     # Be polite: add a random delay between requests
     time.sleep(random.uniform(0.5, 2.0))
 
+stats = connection_stats.snapshot()
+print(f"Connections: {stats['connections_opened']} opened, {stats['connections_reused']} reused for {stats['requests']} requests "
+      f"(DNS cache: {stats['dns_cache_hits']} hits, {stats['dns_cache_misses']} misses).")
+
 df['combined_text'] = scraped_texts
 
 # Filter out rows where scraping failed completely or resulted in very little text